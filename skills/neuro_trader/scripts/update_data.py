@@ -36,18 +36,32 @@ class DataPipeline:
             return None
             
         try:
-            # optimize: read only last few lines or use pandas with chunksize if file is huge
-            # for now, simple read since files aren't gigabytes yet
-            df = pd.read_csv(file_path)
-            if df.empty or 'time' not in df.columns:
-                return None
+            # Only the header and the tail are read: M1 histories grow to
+            # millions of rows and we just need the final timestamp
+            with open(file_path, 'rb') as f:
+                header = f.readline().strip()
+                if not header:
+                    return None # Empty file
+                columns = header.decode().split(',')
+                if 'time' not in columns:
+                    # Must not look like "no data": update_data would
+                    # re-fetch from scratch and overwrite this file
+                    raise ValueError(f"no 'time' column in header {columns}")
+                
+                f.seek(0, os.SEEK_END)
+                f.seek(max(f.tell() - 4096, 0))
+                lines = [l for l in f.read().splitlines() if l.strip()]
+            
+            if not lines or lines[-1].strip() == header:
+                return None # Header only
             
             # Ensure time is datetime
-            last_time_str = df['time'].iloc[-1]
+            last_time_str = lines[-1].decode().split(',')[columns.index('time')]
             return pd.to_datetime(last_time_str)
         except Exception as e:
+            # Fail loudly for existing files (same overwrite risk as above)
             self.logger.error(f"Error reading {file_path}: {e}")
-            return None
+            raise
 
     async def update_data(self):
         self.raw_data_dir.mkdir(parents=True, exist_ok=True)
@@ -60,7 +74,14 @@ class DataPipeline:
                 file_path = self.raw_data_dir / file_name
                 
                 # 1. Check Last Timestamp
-                last_date = self.get_last_timestamp(file_path)
+                # An unreadable CSV must not be treated as "no data" (that would
+                # overwrite it), but it should not stop the other files either
+                try:
+                    last_date = self.get_last_timestamp(file_path)
+                except Exception:
+                    self.logger.warning(f"Skipping {file_name}: could not read its last timestamp")
+                    print(f"   ⚠️ {symbol} {tf}: Unreadable CSV, skipping {file_name}")
+                    continue
                 
                 now = datetime.now()
                 fetch_from = self.min_start_date
@@ -95,7 +116,9 @@ class DataPipeline:
                         # Drop Duplicates based on time
                         # Keep='last' effectively updates the candle if it changed
                         combined_df.drop_duplicates(subset=['time'], keep='last', inplace=True)
-                        combined_df.sort_values('time', inplace=True)
+                        # New bars start at last_date, so the merge is normally already in order
+                        if not combined_df['time'].is_monotonic_increasing:
+                            combined_df.sort_values('time', inplace=True)
                         
                         combined_df.to_csv(file_path, index=False)
                         added_rows = len(combined_df) - len(existing_df)
@@ -2,7 +2,8 @@ import logging
 import asyncio
 import platform
 import random
-from datetime import datetime, timedelta
+from datetime import datetime
+import numpy as np
 import pandas as pd
 
 # Conditional Import
@@ -71,24 +72,19 @@ class MT5Driver:
         """
         if self.is_mock:
             self.logger.info(f"Generating {count} mock candles for {symbol}...")
-            # Mock Data Generation
-            dates = [datetime.now() - timedelta(minutes=i) for i in range(count)]
-            dates.reverse()
+            # Mock Data Generation (vectorized random walk, oldest first)
+            end = datetime.now()
+            dates = end - pd.to_timedelta(np.arange(count - 1, -1, -1), unit="min")
+            price = 1.1000 + np.cumsum(np.random.uniform(-0.001, 0.001, count))
             
-            data = []
-            price = 1.1000
-            for date in dates:
-                change = random.uniform(-0.001, 0.001)
-                price += change
-                data.append({
-                    "time": date,
-                    "open": price,
-                    "high": price + 0.0005,
-                    "low": price - 0.0005,
-                    "close": price + 0.0002,
-                    "tick_volume": int(random.uniform(100, 1000))
-                })
-            return pd.DataFrame(data)
+            return pd.DataFrame({
+                "time": dates,
+                "open": price,
+                "high": price + 0.0005,
+                "low": price - 0.0005,
+                "close": price + 0.0002,
+                "tick_volume": np.random.uniform(100, 1000, count).astype(np.int64)
+            })
 
         # Real MT5 Data Fetch
         if not self.connected:
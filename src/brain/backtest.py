@@ -9,37 +9,32 @@ from pathlib import Path
 import matplotlib
 # Force Agg backend to prevent Colab display errors
 matplotlib.use('Agg')
-from stable_baselines3 import PPO
-from sb3_contrib import RecurrentPPO # For Level 2+
+# stable_baselines3 / sb3_contrib (and torch) are imported lazily in backtest()
 
 # Add src to path
 ROOT_DIR = Path(__file__).resolve().parent.parent.parent
 sys.path.append(str(ROOT_DIR / "src"))
 
 from brain.env.trading_env import TradingEnv
+from brain.model_discovery import find_best_model
 
 def calculate_max_drawdown(equity_curve):
     """Calculates the maximum drawdown percentage."""
-    peak = equity_curve[0]
-    max_dd = 0
-    
-    for x in equity_curve:
-        if x > peak: 
-            peak = x
-        dd = (peak - x) / peak
-        if dd > max_dd:
-            max_dd = dd
+    equity = np.asarray(equity_curve, dtype=np.float64)
+    # Running peak in one vectorized pass instead of a per-step Python loop
+    peak = np.maximum.accumulate(equity)
+    max_dd = ((peak - equity) / peak).max()
             
-    return max_dd * 100
+    return float(max_dd) * 100
 
-def backtest(model_path, data_path, model_type="mlp"):
+def backtest(model_path, data_path, model_type="mlp", device="cpu"):
     print(f"📉 Loading Data: {data_path}")
-    df = pd.read_parquet(data_path)
+    df = pd.read_parquet(data_path, engine="pyarrow", memory_map=True)
     print(f"✅ Data loaded: {len(df):,} rows")
 
     # Verify columns (similar to train script)
     # This ensures we don't crash if using a Level 2 model on Level 1 data
-    feature_cols = TradingEnv(df).feature_cols # Get expected cols from Env
+    feature_cols = TradingEnv.required_columns(df) # No throwaway Env just to read its columns
     missing = [c for c in feature_cols if c not in df.columns]
     if missing:
         print(f"❌ Error: Dataset missing features required by Env: {missing}")
@@ -50,13 +45,16 @@ def backtest(model_path, data_path, model_type="mlp"):
     obs, _ = env.reset()
 
     # Load Model
-    print(f"🧠 Loading Model: {model_path} ({model_type})")
+    # Single-sample inference: CPU avoids CUDA context init and per-step H2D copies
+    print(f"🧠 Loading Model: {model_path} ({model_type}, device={device})")
     if model_type.lower() == "lstm":
-        model = RecurrentPPO.load(model_path)
+        from sb3_contrib import RecurrentPPO # For Level 2+
+        model = RecurrentPPO.load(model_path, device=device)
         lstm_states = None # Init LSTM state
         dones = np.ones(1) # Start of episode
     else:
-        model = PPO.load(model_path)
+        from stable_baselines3 import PPO
+        model = PPO.load(model_path, device=device)
 
     # Tracking
     equity_curve = [env.balance]
@@ -107,6 +105,7 @@ if __name__ == "__main__":
     parser.add_argument("--data", type=str, help="Path to .parquet data file")
     parser.add_argument("--level", type=int, help="Level (1=MLP, 2=LSTM) - Auto-resolves model/data paths")
     parser.add_argument("--type", type=str, default="mlp", choices=["mlp", "lstm"], help="Model type override")
+    parser.add_argument("--device", type=str, default="cpu", help="Torch device for inference (cpu, cuda, auto)")
     
     args = parser.parse_args()
     
@@ -124,11 +123,10 @@ if __name__ == "__main__":
             model_path = os.path.join(base_dir, "models", sub_dir, "final_model.zip")
             if not os.path.exists(model_path):
                  print(f"⚠️  Could not find auto-resolved model: {model_path}")
-                 # Fallback to searching
-                 import glob
-                 candidates = glob.glob(os.path.join(base_dir, "models", sub_dir, "*.zip"))
-                 if candidates:
-                     model_path = candidates[-1] # Take latest
+                 # Fallback to the most trained checkpoint (reads zip metadata only)
+                 best = find_best_model(os.path.join(base_dir, "models", sub_dir))
+                 if best:
+                     model_path = str(best)
             args.model = model_path
             
         # Resolve Data
@@ -154,4 +152,4 @@ if __name__ == "__main__":
         print("❌ Error: Must provide --model and --data OR --level")
         sys.exit(1)
 
-    backtest(args.model, args.data, args.type)
+    backtest(args.model, args.data, args.type, args.device)
@@ -11,6 +11,23 @@ class TradingEnv(gym.Env):
     """
     metadata = {'render_modes': ['human']}
 
+    # Features expected in DF (order = observation layout)
+    FEATURE_COLS = (
+        'close', 'rsi', 'macd', 'macd_signal',
+        'bb_high', 'bb_low', 'ema_20', 'ema_50',
+        'atr', 'log_ret_lag_1', 'log_ret_lag_2', 'log_ret_lag_3', 'log_ret_lag_5'
+    )
+    NEWS_COL = 'news_impact_score'
+
+    @classmethod
+    def required_columns(cls, df):
+        """Feature columns the env will read from df (adds news if present)."""
+        cols = list(cls.FEATURE_COLS)
+        # Level 3: Add News Impact if available
+        if cls.NEWS_COL in df.columns:
+            cols.append(cls.NEWS_COL)
+        return cols
+
     def __init__(self, df: pd.DataFrame, initial_balance=10000, max_steps=None, render_mode=None):
         super(TradingEnv, self).__init__()
         
@@ -24,22 +41,20 @@ class TradingEnv(gym.Env):
         
         # Observation Space: 
         # [Close Price, RSI, MACD, MACD_Signal, BB_High, BB_Low, EMA_20, EMA_50, Balance, Position]
-        # We assume these columns exist in the dataframe        # Features expected in DF
-        self.feature_cols = [
-            'close', 'rsi', 'macd', 'macd_signal', 
-            'bb_high', 'bb_low', 'ema_20', 'ema_50',
-            'atr', 'log_ret_lag_1', 'log_ret_lag_2', 'log_ret_lag_3', 'log_ret_lag_5'
-        ]
-        
-        # Level 3: Add News Impact if available
-        if 'news_impact_score' in df.columns:
-            self.feature_cols.append('news_impact_score')
+        # We assume these columns exist in the dataframe
+        self.feature_cols = self.required_columns(df)
         
         # Check if cols exist
         missing_cols = [c for c in self.feature_cols if c not in df.columns]
         if missing_cols:
             raise ValueError(f"Dataframe missing required columns: {missing_cols}")
 
+        # Feature matrix extracted once, so each observation is a row slice
+        # instead of per-column pandas lookups + a Python list
+        self._features = df[self.feature_cols].to_numpy(dtype=np.float32)
+        # Close prices for step(), kept float64 for fee/equity math
+        self._close = df['close'].to_numpy(dtype=np.float64)
+
         num_features = len(self.feature_cols) + 2 # +2 for balance and position
         self.observation_space = spaces.Box(
             low=-np.inf, high=np.inf, shape=(num_features,), dtype=np.float32
@@ -68,20 +83,16 @@ class TradingEnv(gym.Env):
         return self._get_observation(), {}
 
     def _get_observation(self):
-        # Get current row
-        row = self.df.iloc[self.current_step]
-        
-        obs = [
-            row[col] for col in self.feature_cols
-        ]
-        # Add account state
-        obs.append(self.balance)
-        obs.append(self.position)
+        # Current row features + account state, filled into one array
+        obs = np.empty(self.observation_space.shape, dtype=np.float32)
+        obs[:-2] = self._features[self.current_step]
+        obs[-2] = self.balance
+        obs[-1] = self.position
         
-        return np.array(obs, dtype=np.float32)
+        return obs
 
     def step(self, action):
-        current_price = self.df.iloc[self.current_step]['close']
+        current_price = self._close[self.current_step]
         
         # Execute Action
         # Simplification: All-in Buy/Sell for now to train basic logic
@@ -121,7 +132,7 @@ class TradingEnv(gym.Env):
         self.current_step += 1
         
         # Calculate Equity
-        self.equity = self.balance + (self.position * self.df.iloc[self.current_step]['close'] if self.current_step < len(self.df) else 0)
+        self.equity = self.balance + (self.position * self._close[self.current_step] if self.current_step < len(self.df) else 0)
         
         # Reward: Change in equity (Log return is better for training stability)
         # reward = self.equity - prev_equity
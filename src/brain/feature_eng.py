@@ -0,0 +1,43 @@
+import numpy as np
+import ta
+
+
+def add_features(df, level=1):
+    """
+    Adds the technical indicators expected by TradingEnv (in place).
+    Shared by tools/process_data.py and the live traders so training
+    and inference features are computed by the same code.
+    """
+    close = df['close']
+
+    # Trend
+    df['ema_20'] = ta.trend.EMAIndicator(close=close, window=20).ema_indicator()
+    df['ema_50'] = ta.trend.EMAIndicator(close=close, window=50).ema_indicator()
+
+    # Momentum
+    df['rsi'] = ta.momentum.RSIIndicator(close=close, window=14).rsi()
+    macd = ta.trend.MACD(close=close)
+    df['macd'] = macd.macd()
+    df['macd_signal'] = macd.macd_signal()
+
+    # Volatility
+    # Bollinger Bands (20, 2.0) from a single rolling window reused for
+    # mean and std (same values as ta.volatility.BollingerBands)
+    window = close.rolling(20, min_periods=20)
+    bb_mid = window.mean()
+    bb_std = window.std(ddof=0)
+    df['bb_high'] = bb_mid + 2.0 * bb_std
+    df['bb_low'] = bb_mid - 2.0 * bb_std
+
+    # [LEVEL 2] Advanced Features
+    if level >= 2:
+        # ATR for Stop Loss / Volatility sizing
+        df['atr'] = ta.volatility.AverageTrueRange(high=df['high'], low=df['low'], close=close, window=14).average_true_range()
+
+        # Lag Features (Short-term memory for MLP/LSTM)
+        # Log Returns of last 1, 2, 3, 5 candles
+        df['log_ret'] = np.log(close / close.shift(1))
+        for lag in [1, 2, 3, 5]:
+            df[f'log_ret_lag_{lag}'] = df['log_ret'].shift(lag)
+
+    return df
@@ -32,21 +32,14 @@ class LLMProcessor:
             )
             
             # Simple Sentiment Analysis Prompt
-            template = """
-            You are a senior financial analyst. Analyze the following market data and news provided below.
-            
-            Market Data: {market_data}
-            
-            Task:
-            1. Determine the sentiment (BULLISH, BEARISH, NEUTRAL).
-            2. Provide a confidence score (0.0 to 1.0).
-            3. Give a concise reasoning.
-            
-            Output format:
-            Sentiment: [BULLISH/BEARISH/NEUTRAL]
-            Confidence: [0.0-1.0]
-            Reason: [One sentence summary]
-            """
+            # Kept minimal: Ollama latency scales with prompt + output tokens
+            template = """Classify the market sentiment from this data.
+Market Data: {market_data}
+Reply exactly:
+Sentiment: BULLISH|BEARISH|NEUTRAL
+Confidence: 0.0-1.0
+Reason: one sentence
+"""
             
             prompt = PromptTemplate(template=template, input_variables=["market_data"])
             self.chain = prompt | self.llm # LCEL Syntax
@@ -54,6 +47,18 @@ class LLMProcessor:
         except Exception as e:
             self.logger.error(f"Failed to init LLM: {e}")
 
+    @staticmethod
+    def _format_market_data(market_data):
+        """Compact key=value rendering, far fewer tokens than the dict repr."""
+        if not isinstance(market_data, dict):
+            return str(market_data)
+        # 6 significant digits: keeps FX pips (1.12345), gold cents (2034.56)
+        # and tiny values like log returns (4.2e-05) that fixed decimals zero out
+        return ' '.join(
+            f"{k}={v:.6g}" if isinstance(v, float) else f"{k}={v}"
+            for k, v in sorted(market_data.items())
+        )
+
     async def analyze(self, market_data):
         """
         Analyzes market data using local Ollama instance.
@@ -67,7 +72,7 @@ class LLMProcessor:
             # Run in executor to avoid blocking asyncio loop
             # LangChain invoke can be blocking
             loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, self.chain.invoke, {"market_data": str(market_data)})
+            response = await loop.run_in_executor(None, self.chain.invoke, {"market_data": self._format_market_data(market_data)})
             
             self.logger.debug(f"LLM Output: {response}")
             
@@ -0,0 +1,101 @@
+import json
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+def _peek_num_timesteps(model_path):
+    """
+    Reads num_timesteps from the 'data' entry of an SB3 model zip.
+    Only the small JSON blob is parsed; policy.pth / optimizer tensors are
+    never loaded (PPO.load would deserialize all of them).
+    Returns None if the file is not a readable SB3 archive.
+    """
+    try:
+        with zipfile.ZipFile(model_path) as zf:
+            data = json.loads(zf.read("data"))
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        return None
+
+    value = data.get("num_timesteps")
+    if isinstance(value, int):
+        return value
+
+    # Non-JSON types are stored as {":type:": ..., ":serialized:": <base64 cloudpickle>}
+    if isinstance(value, dict) and ":serialized:" in value:
+        try:
+            import base64
+            import cloudpickle
+            return int(cloudpickle.loads(base64.b64decode(value[":serialized:"])))
+        except Exception:
+            return None
+
+    return None
+
+
+def get_model_info(model_path, stat=None):
+    """
+    Returns metadata for a model zip without loading the model.
+    Pass an already fetched os.stat_result as `stat` to skip the syscall.
+    """
+    model_path = Path(model_path)
+    st = stat if stat is not None else model_path.stat()
+    return {
+        'path': model_path,
+        'name': model_path.name,
+        'num_timesteps': _peek_num_timesteps(model_path),
+        'mtime': st.st_mtime,
+        'size': st.st_size,
+    }
+
+
+def _inspect_one(entry):
+    try:
+        # DirEntry.stat() is cached by scandir, so this is the only stat per file
+        return get_model_info(entry.path, stat=entry.stat())
+    except OSError:
+        return None # Deleted/unreadable between scandir and stat
+
+
+def _scan_models(search_dir, stat_threads):
+    """
+    Inspects every model zip in search_dir (unordered).
+    Files are inspected on a thread pool: the work is stat + zip
+    central-directory reads, which overlap well on Drive/NFS mounts.
+    """
+    try:
+        with os.scandir(search_dir) as it:
+            model_files = [e for e in it if e.name.endswith('.zip') and e.is_file()]
+    except OSError:
+        return [] # Missing or unreadable directory
+
+    if stat_threads > 1 and len(model_files) > 1:
+        with ThreadPoolExecutor(max_workers=min(stat_threads, len(model_files))) as ex:
+            infos = list(ex.map(_inspect_one, model_files))
+    else:
+        infos = [_inspect_one(e) for e in model_files]
+
+    return [m for m in infos if m is not None]
+
+
+def list_available_models(search_dir, stat_threads=8):
+    """Lists model zips in search_dir, newest first."""
+    models = _scan_models(search_dir, stat_threads)
+    models.sort(key=lambda m: m['mtime'], reverse=True)
+    return models
+
+
+def find_best_model(search_dir, stat_threads=8):
+    """
+    Picks the most trained model in search_dir (highest num_timesteps,
+    newest file on ties). Returns its Path, or None if nothing usable.
+    """
+    candidates = [m for m in _scan_models(search_dir, stat_threads) if m['num_timesteps'] is not None]
+    if not candidates:
+        return None
+    if len(candidates) == 1: # Common single-model deployment
+        return candidates[0]['path']
+
+    best = max(candidates, key=lambda m: (m['num_timesteps'], m['mtime']))
+    return best['path']
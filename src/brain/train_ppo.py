@@ -1,18 +1,19 @@
 
-import gymnasium as gym
-from gymnasium import spaces
 import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 import matplotlib
 # Force Agg backend for Colab/Headless to prevent display errors
 matplotlib.use('Agg')
 from stable_baselines3 import PPO
 from sb3_contrib import RecurrentPPO
 from stable_baselines3.common.callbacks import CheckpointCallback
-from stable_baselines3.common.monitor import Monitor
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecMonitor
 import os
-import glob
+import fnmatch
+import shutil
 import sys
+import tempfile
 import argparse
 from pathlib import Path
 
@@ -40,27 +41,105 @@ def find_data_file(level=1):
     if level == 3:
         pattern = "*_News.parquet"
     
-    # Priority: Drive -> Local
-    files = glob.glob(os.path.join(DATA_DIR_DRIVE, pattern))
-    if not files:
-        files = glob.glob(os.path.join(DATA_DIR_LOCAL, pattern))
-    if not files:
-        files = glob.glob(pattern) # CWD
+    # Priority: Drive -> Local -> CWD
+    # One scandir pass per dir, stopping at the first match (Drive listings are slow)
+    for data_dir in (DATA_DIR_DRIVE, DATA_DIR_LOCAL, "."):
+        if not os.path.isdir(data_dir):
+            continue # e.g. no Drive mount off-Colab
+        with os.scandir(data_dir) as it:
+            for entry in it:
+                if fnmatch.fnmatch(entry.name, pattern) and entry.is_file():
+                    return entry.path if data_dir != "." else entry.name
         
-    return files[0] if files else None
+    return None
+
+LATEST_FILE = "latest.txt"
+
+class LatestCheckpointCallback(CheckpointCallback):
+    """
+    CheckpointCallback that also records the newest checkpoint name in latest.txt.
+    If tb_sync=(local_dir, drive_dir) is given, TensorBoard logs are copied to
+    Drive at every save, so a killed Colab runtime loses at most one interval.
+    """
+    def __init__(self, *args, tb_sync=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tb_sync = tb_sync
+
+    def _on_step(self):
+        result = super()._on_step()
+        if self.n_calls % self.save_freq == 0:
+            write_latest(self.save_path, self._checkpoint_path(extension="zip"))
+            if self.tb_sync:
+                sync_logs(*self.tb_sync)
+        return result
+
+def sync_logs(local_dir, drive_dir):
+    shutil.copytree(local_dir, drive_dir, dirs_exist_ok=True)
+
+def write_latest(model_dir, checkpoint_path):
+    with open(os.path.join(model_dir, LATEST_FILE), "w") as f:
+        f.write(os.path.basename(checkpoint_path))
 
 def find_latest_checkpoint(model_dir):
     """Finds the latest checkpoint in the model directory."""
-    checkpoints = glob.glob(os.path.join(model_dir, "*.zip"))
+    # Fast path: pointer written at save time (O(1) on Drive, no directory scan)
+    try:
+        with open(os.path.join(model_dir, LATEST_FILE)) as f:
+            latest = os.path.join(model_dir, f.read().strip())
+        if latest.endswith(".zip") and os.path.isfile(latest):
+            return latest
+    except OSError:
+        pass # No pointer yet (older runs) -> scan
+    
+    # scandir caches each entry's stat, so this is one stat per file
+    # (glob + getmtime re-stats every path on slow Drive mounts)
+    try:
+        with os.scandir(model_dir) as it:
+            checkpoints = [(e.stat().st_mtime, e.path) for e in it if e.name.endswith(".zip") and e.is_file()]
+    except OSError:
+        return None
     if not checkpoints:
         return None
-    # Sort by modification time
-    latest_checkpoint = max(checkpoints, key=os.path.getmtime)
-    return latest_checkpoint
+    # Latest by modification time
+    return max(checkpoints)[1]
+
+def rollout_batch_size(rollout_size, minibatches=4):
+    """Largest minibatch <= rollout/minibatches that divides the rollout (no truncated batch)."""
+    batch_size = max(rollout_size // minibatches, 1)
+    while rollout_size % batch_size:
+        batch_size -= 1
+    return batch_size
+
+def make_env(df_shard, single_thread=False):
+    """Env factory for VecEnv workers (must be picklable for SubprocVecEnv)."""
+    def _init():
+        if single_thread:
+            # N workers each spawning cpu_count() torch/BLAS threads oversubscribe the cores
+            import torch
+            torch.set_num_threads(1)
+        return TradingEnv(df_shard)
+    return _init
+
+def build_vec_env(df, n_envs=1):
+    """
+    Splits df into n_envs contiguous shards, one env per shard.
+    n_envs > 1 steps the shards in parallel worker processes.
+    Episode stats are tracked once in the parent by VecMonitor
+    (no per-env Monitor wrappers inside the workers).
+    """
+    if n_envs <= 1:
+        return VecMonitor(DummyVecEnv([make_env(df)]))
+    
+    bounds = np.linspace(0, len(df), n_envs + 1, dtype=int)
+    shards = [df.iloc[bounds[i]:bounds[i + 1]].reset_index(drop=True) for i in range(n_envs)]
+    return VecMonitor(SubprocVecEnv([make_env(shard, single_thread=True) for shard in shards]))
 
 def main():
     parser = argparse.ArgumentParser(description="Train PPO/RecurrentPPO Agent")
     parser.add_argument("--level", type=int, default=1, choices=[1, 2, 3], help="Training Level (1=MLP, 2=LSTM, 3=Hybrid)")
+    parser.add_argument("--n-envs", type=int, default=1, help="Parallel envs (SubprocVecEnv when > 1)")
+    parser.add_argument("--device", type=str, default=None, help="Torch device (default: cpu for MLP, auto for LSTM)")
+    parser.add_argument("--batch-size", type=int, default=None, help="PPO minibatch size (default: 64, or a quarter of the rollout with --n-envs)")
     args = parser.parse_args()
     
     level = args.level
@@ -73,12 +152,24 @@ def main():
     log_dir = os.path.join(WORKSPACE_DRIVE, "logs", sub_dir)
     model_dir = os.path.join(WORKSPACE_DRIVE, "models", sub_dir)
     
-    print(f"🚀 Starting NeuroTrader Training (Level {level}: {model_type})...")
+    # Small MLP: per-minibatch host<->GPU copies cost more than the matmuls
+    # (SB3 itself warns to run PPO MlpPolicy on CPU). The 256-unit LSTM can use a GPU.
+    device = args.device or ("cpu" if level == 1 else "auto")
+    
+    print(f"🚀 Starting NeuroTrader Training (Level {level}: {model_type}, device={device})...")
     print(f"📂 Directories: \n  Logs: {log_dir}\n  Models: {model_dir}")
     
     os.makedirs(log_dir, exist_ok=True)
     os.makedirs(model_dir, exist_ok=True)
     
+    # TensorBoard flushes event files every rollout; on the Drive FUSE mount
+    # each flush stalls training, so log locally and copy to Drive at every
+    # checkpoint save and at the end
+    tb_dir = log_dir
+    if WORKSPACE_DRIVE.startswith("/content/drive"):
+        tb_dir = os.path.join(tempfile.gettempdir(), "tb_logs", sub_dir)
+        os.makedirs(tb_dir, exist_ok=True)
+    
     # 1. Load Data
     data_file = find_data_file(level)
     if not data_file:
@@ -87,7 +178,12 @@ def main():
         return
         
     print(f"📂 Loading Data: {data_file}")
-    df = pd.read_parquet(data_file)
+    # memory_map: pyarrow reads column chunks from the page cache instead of
+    # buffering the whole file first (lower peak RSS on large M1 files)
+    # columns: only what TradingEnv observes is read off disk (skips OHLV/time/raw news)
+    available = set(pq.read_schema(data_file).names)
+    columns = [c for c in TradingEnv.FEATURE_COLS + (TradingEnv.NEWS_COL,) if c in available]
+    df = pd.read_parquet(data_file, engine="pyarrow", memory_map=True, columns=columns)
     print(f"✅ Data Loaded: {len(df):,} rows")
     
     # 2. Verify Features (Level 2+)
@@ -98,9 +194,20 @@ def main():
             print(f"❌ Data missing Level 2 features: {missing}")
             return
 
+    # SB3 feeds the policy float32 observations anyway; storing the frame as
+    # float32 halves its RAM (and what every SubprocVecEnv worker receives)
+    float_cols = df.select_dtypes('float64').columns
+    df[float_cols] = df[float_cols].astype(np.float32)
+
     # 3. Create Env
-    env = TradingEnv(df)
-    env = Monitor(env) 
+    n_envs = max(1, args.n_envs)
+    env = build_vec_env(df, n_envs)
+    # Keep the rollout size per update constant (2048 steps total)
+    n_steps = max(2048 // n_envs, 64)
+    # With several envs use 4 large minibatches per epoch instead of 32 tiny
+    # ones: fewer optimizer steps, each a better-filled matmul
+    batch_size = args.batch_size or (64 if n_envs == 1 else rollout_batch_size(n_steps * n_envs))
+    print(f"🧩 Envs: {n_envs} (n_steps per env: {n_steps}, batch_size: {batch_size})")
     
     # 4. Define Agent (Load or Create)
     latest_ckpt = find_latest_checkpoint(model_dir)
@@ -108,9 +215,11 @@ def main():
     if latest_ckpt:
         print(f"🔄 Resuming from Checkpoint: {latest_ckpt}")
         if level == 1:
-            model = PPO.load(latest_ckpt, env=env, tensorboard_log=log_dir)
+            model = PPO.load(latest_ckpt, env=env, tensorboard_log=tb_dir, device=device,
+                             n_steps=n_steps, batch_size=batch_size)
         else:
-            model = RecurrentPPO.load(latest_ckpt, env=env, tensorboard_log=log_dir)
+            model = RecurrentPPO.load(latest_ckpt, env=env, tensorboard_log=tb_dir, device=device,
+                                      n_steps=n_steps, batch_size=batch_size)
     else:
         print(f"🧠 Initializing New {model_type} Agent...")
         if level == 1:
@@ -118,10 +227,11 @@ def main():
                 "MlpPolicy", 
                 env, 
                 verbose=1, 
-                tensorboard_log=log_dir,
+                tensorboard_log=tb_dir,
+                device=device,
                 learning_rate=0.0003,
-                n_steps=2048,
-                batch_size=64,
+                n_steps=n_steps,
+                batch_size=batch_size,
                 gamma=0.99,
                 ent_coef=0.01 # Force exploration to prevent "Frozen Agent"
             )
@@ -130,10 +240,11 @@ def main():
                 "MlpLstmPolicy", 
                 env, 
                 verbose=1, 
-                tensorboard_log=log_dir,
+                tensorboard_log=tb_dir,
+                device=device,
                 learning_rate=0.0003,
-                n_steps=2048,
-                batch_size=64,
+                n_steps=n_steps,
+                batch_size=batch_size,
                 gamma=0.99,
                 ent_coef=0.01, # Force exploration
                 policy_kwargs={
@@ -143,10 +254,11 @@ def main():
                 }
             )
 
-    checkpoint_callback = CheckpointCallback(
-        save_freq=50000, 
+    checkpoint_callback = LatestCheckpointCallback(
+        save_freq=max(50000 // n_envs, 1), # Counted in vec-env steps (n_envs transitions each)
         save_path=model_dir,
-        name_prefix=f"neurotrader_L{level}"
+        name_prefix=f"neurotrader_L{level}",
+        tb_sync=(tb_dir, log_dir) if tb_dir != log_dir else None
     )
 
     total_timesteps = 3_000_000 if level == 1 else 5_000_000
@@ -164,10 +276,15 @@ def main():
         )
     except KeyboardInterrupt:
         print("\n⚠️ Training Interrupted! Saving current model...")
+    finally:
+        if tb_dir != log_dir:
+            sync_logs(tb_dir, log_dir)
+            print(f"📤 TensorBoard logs synced to: {log_dir}")
         
     # 6. Save Final
     final_path = os.path.join(model_dir, "final_model")
     model.save(final_path)
+    write_latest(model_dir, final_path + ".zip")
     print(f"✨ Training Complete. Model saved to: {final_path}.zip")
 
 if __name__ == "__main__":
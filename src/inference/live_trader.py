@@ -4,7 +4,6 @@ import sys
 import argparse
 import pandas as pd
 import numpy as np
-import ta
 import time
 from pathlib import Path
 from datetime import datetime
@@ -17,11 +16,12 @@ sys.path.append(str(ROOT_DIR))
 
 from src.body.mt5_driver import MT5Driver
 from src.utils.logger import get_logger
+from src.brain.feature_eng import add_features
 from sb3_contrib import RecurrentPPO
 from stable_baselines3 import PPO
 
 class LiveTrader:
-    def __init__(self, model_path, symbol="XAUUSDm", timeframe="H1", volume=0.01, level=2):
+    def __init__(self, model_path, symbol="XAUUSDm", timeframe="H1", volume=0.01, level=2, device="cpu"):
         self.logger = get_logger("LiveTrader")
         self.symbol = symbol
         self.timeframe = timeframe
@@ -31,14 +31,14 @@ class LiveTrader:
         # Connect to MT5
         self.driver = MT5Driver()
         
-        # Load Model
-        self.logger.info(f"🧠 Loading Model: {model_path}")
+        # Load Model (CPU by default: one obs per bar, CUDA init/transfers cost more than they save)
+        self.logger.info(f"🧠 Loading Model: {model_path} (device={device})")
         if level == 2:
-            self.model = RecurrentPPO.load(model_path)
+            self.model = RecurrentPPO.load(model_path, device=device)
             self.lstm_states = None
             self.episode_starts = np.ones((1,), dtype=bool)
         else:
-            self.model = PPO.load(model_path)
+            self.model = PPO.load(model_path, device=device)
             
         # Feature Cols (Must match training exactly)
         self.feature_cols = [
@@ -47,32 +47,16 @@ class LiveTrader:
         ]
         if level >= 2:
             self.feature_cols.extend(['atr', 'log_ret_lag_1', 'log_ret_lag_2', 'log_ret_lag_3', 'log_ret_lag_5'])
+        
+        # Decisions only change when a new candle closes (we decide on iloc[-2])
+        self._decided_bar_time = None
             
     async def initialize(self):
         return await self.driver.initialize()
         
     def calculate_features(self, df):
-        """Replicates process_data.py logic for a rolling window."""
-        df = df.copy()
-        
-        # Basic Indicators
-        df['ema_20'] = ta.trend.EMAIndicator(close=df['close'], window=20).ema_indicator()
-        df['ema_50'] = ta.trend.EMAIndicator(close=df['close'], window=50).ema_indicator()
-        df['rsi'] = ta.momentum.RSIIndicator(close=df['close'], window=14).rsi()
-        macd = ta.trend.MACD(close=df['close'])
-        df['macd'] = macd.macd()
-        df['macd_signal'] = macd.macd_signal()
-        bb = ta.volatility.BollingerBands(close=df['close'], window=20, window_dev=2.0)
-        df['bb_high'] = bb.bollinger_hband()
-        df['bb_low'] = bb.bollinger_lband()
-        
-        if self.level >= 2:
-            df['atr'] = ta.volatility.AverageTrueRange(high=df['high'], low=df['low'], close=df['close'], window=14).average_true_range()
-            df['log_ret'] = np.log(df['close'] / df['close'].shift(1))
-            for lag in [1, 2, 3, 5]:
-                df[f'log_ret_lag_{lag}'] = df['log_ret'].shift(lag)
-                
-        return df
+        """Applies the same feature engineering as process_data.py."""
+        return add_features(df.copy(), level=self.level)
 
     async def trade_loop(self):
         self.logger.info(f"🚀 Starting Live Trader on {self.symbol} ({self.timeframe})")
@@ -87,7 +71,14 @@ class LiveTrader:
                     await asyncio.sleep(10)
                     continue
                 
-                # 2. Process Features
+                # 2. Process Features (only once per closed candle)
+                # Same closed bar as last tick -> features, prediction and
+                # decision would be identical (and re-sending the order would
+                # duplicate it), so just wait for the next candle.
+                closed_bar_time = df['time'].iloc[-2]
+                if closed_bar_time == self._decided_bar_time:
+                    await asyncio.sleep(60)
+                    continue
                 df = self.calculate_features(df)
                 
                 # Get last complete candle (iloc[-1] is usually current evolving candle in MT5?)
@@ -103,7 +94,10 @@ class LiveTrader:
                 current_row = df.iloc[-2]  # Safe
                 
                 # 3. Construct Observation
-                obs = [current_row[col] for col in self.feature_cols]
+                # One typed read of the feature block instead of a Series lookup per column
+                features = df[self.feature_cols].to_numpy(dtype=np.float32)[-2]
+                obs_array = np.empty(len(features) + 2, dtype=np.float32)
+                obs_array[:-2] = features
                 # Append Account Info (Balance, Position) 
                 # TODO: Get real balance/position from MT5. For now, mock or 0.
                 # If we passed balance=0 during training, it might affect model.
@@ -111,19 +105,18 @@ class LiveTrader:
                 
                 # Mock Account State for Consistency with Training
                 # Ideally we fetch AccountInfo from MT5
-                obs.append(10000.0) # Balance
-                obs.append(0.0)     # Position
-                
-                obs_array = np.array(obs, dtype=np.float32)
+                obs_array[-2] = 10000.0 # Balance
+                obs_array[-1] = 0.0     # Position
                 
                 # 4. Predict
                 if self.level == 2:
-                    action, self.lstm_states = self.model.predict(
+                    # LSTM state is committed only after the bar is done (see below),
+                    # so a retried bar does not step the recurrent state twice
+                    action, next_lstm_states = self.model.predict(
                         obs_array, 
                         state=self.lstm_states, 
                         episode_start=self.episode_starts
                     )
-                    self.episode_starts = np.zeros((1,), dtype=bool)
                 else:
                     action, _ = self.model.predict(obs_array)
                     
@@ -144,11 +137,23 @@ class LiveTrader:
                 self.logger.info(f"📊 Signal: {decision['action']} @ {price} (Time: {current_row['time']})")
                 
                 if action != 0:
-                    await self.driver.execute_trade(decision)
+                    ok = await self.driver.execute_trade(decision)
+                    if ok is False:
+                        # Rejected order: leave the bar undecided so the next poll retries it
+                        self.logger.warning(f"⚠️ Order not executed: {decision['action']} @ {price}. Retrying next poll...")
+                        await asyncio.sleep(60)
+                        continue
+                
+                # Only mark the bar done once its decision went through (no
+                # exception, order not rejected), so a failed bar is retried
+                self._decided_bar_time = closed_bar_time
+                if self.level == 2:
+                    self.lstm_states = next_lstm_states
+                    self.episode_starts = np.zeros((1,), dtype=bool)
                     
                 # Wait for next candle? or Sleep fixed time?
                 # H1 = 3600s. Sleeping 60s is fine to check updates.
-                print(f"💤 Sleeping... (Last close: {price})")
+                self.logger.debug("💤 Sleeping... (Last close: %s)", price) # Lazy formatting, no stdout write per tick
                 await asyncio.sleep(60) 
                 
             except Exception as e:
@@ -161,10 +166,11 @@ if __name__ == "__main__":
     parser.add_argument("--symbol", type=str, default="XAUUSDm")
     parser.add_argument("--volume", type=float, default=0.01)
     parser.add_argument("--level", type=int, default=2)
+    parser.add_argument("--device", type=str, default="cpu", help="Torch device for inference (cpu, cuda, auto)")
     
     args = parser.parse_args()
     
-    trader = LiveTrader(args.model, args.symbol, volume=args.volume, level=args.level)
+    trader = LiveTrader(args.model, args.symbol, volume=args.volume, level=args.level, device=args.device)
     
     loop = asyncio.get_event_loop()
     loop.run_until_complete(trader.initialize())
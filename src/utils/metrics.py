@@ -23,15 +23,8 @@ class PerformanceMetrics:
         if not equity_curve or len(equity_curve) < 2:
             return 0.0
             
-        equity_np = np.array(equity_curve)
-        peak = equity_np[0]
-        max_dd = 0.0
-        
-        for value in equity_np:
-            if value > peak:
-                peak = value
-            dd = (peak - value) / peak
-            if dd > max_dd:
-                max_dd = dd
+        equity_np = np.asarray(equity_curve, dtype=np.float64)
+        peak = np.maximum.accumulate(equity_np) # Running peak
+        max_dd = ((peak - equity_np) / peak).max()
                 
-        return max_dd * 100 # Percentage
+        return float(max_dd) * 100 # Percentage
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+# Add tools to path (data_pipeline is a script, not a package module)
+sys.path.append(str(Path(__file__).resolve().parent.parent / "tools"))
+
+from data_pipeline import DataPipeline
+
+HEADER = "time,open,high,low,close,tick_volume,spread,real_volume"
+
+def write_csv(path, rows, newline="\n", trailing=""):
+    lines = [HEADER] + [f"{t},1.1,1.2,1.0,1.15,100,0,0" for t in rows]
+    path.write_bytes((newline.join(lines) + newline + trailing).encode())
+    return path
+
+@pytest.fixture
+def pipeline():
+    # Skip __init__ (it sets up the MT5 driver and a file logger under data/logs)
+    p = DataPipeline.__new__(DataPipeline)
+    p.logger = logging.getLogger("test")
+    return p
+
+def test_last_timestamp_normal_file(pipeline, tmp_path):
+    f = write_csv(tmp_path / "a.csv", ["2024-01-01 00:00:00", "2024-01-01 01:00:00"])
+    assert pipeline.get_last_timestamp(f) == pd.Timestamp("2024-01-01 01:00:00")
+
+def test_last_timestamp_large_file(pipeline, tmp_path):
+    times = pd.date_range("2024-01-01", periods=500, freq="min").astype(str)
+    f = write_csv(tmp_path / "big.csv", list(times))
+    assert f.stat().st_size > 4096
+    assert pipeline.get_last_timestamp(f) == pd.Timestamp(times[-1])
+
+def test_last_timestamp_crlf(pipeline, tmp_path):
+    f = write_csv(tmp_path / "crlf.csv", ["2024-01-01 00:00:00", "2024-01-02 00:00:00"], newline="\r\n")
+    assert pipeline.get_last_timestamp(f) == pd.Timestamp("2024-01-02 00:00:00")
+
+def test_last_timestamp_trailing_blank_line(pipeline, tmp_path):
+    f = write_csv(tmp_path / "blank.csv", ["2024-01-01 00:00:00", "2024-01-03 00:00:00"], trailing="\n")
+    assert pipeline.get_last_timestamp(f) == pd.Timestamp("2024-01-03 00:00:00")
+
+def test_last_timestamp_header_only(pipeline, tmp_path):
+    f = write_csv(tmp_path / "empty.csv", [])
+    assert pipeline.get_last_timestamp(f) is None
+
+def test_last_timestamp_missing_file(pipeline, tmp_path):
+    assert pipeline.get_last_timestamp(tmp_path / "missing.csv") is None
+
+def test_last_timestamp_bad_header_raises(pipeline, tmp_path):
+    # Returning None here would make update_data overwrite the file
+    f = tmp_path / "bad.csv"
+    f.write_text("date,open,close\n2024-01-01,1,2\n")
+    with pytest.raises(ValueError):
+        pipeline.get_last_timestamp(f)
+
+class RecordingDriver:
+    def __init__(self):
+        self.fetched = []
+
+    async def fetch_history_range(self, symbol, timeframe, date_from=None, date_to=None):
+        self.fetched.append(symbol)
+        return pd.DataFrame({"time": [pd.Timestamp("2024-01-01")], "close": [1.0]})
+
+def test_update_data_skips_unreadable_csv(pipeline, tmp_path):
+    pipeline.raw_data_dir = tmp_path
+    pipeline.symbols = ["A", "B"]
+    pipeline.timeframes = ["H1"]
+    pipeline.min_start_date = datetime(2010, 1, 1)
+    pipeline.driver = RecordingDriver()
+
+    bad = tmp_path / "A_H1.csv"
+    bad.write_text("date,open,close\n2024-01-01,1,2\n")
+
+    asyncio.run(pipeline.update_data())
+
+    # A is left untouched (not re-fetched / overwritten), B is still fetched
+    assert pipeline.driver.fetched == ["B"]
+    assert bad.read_text() == "date,open,close\n2024-01-01,1,2\n"
+    assert (tmp_path / "B_H1.csv").exists()
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+pytest.importorskip("sb3_contrib")
+
+# Add repo root to path (live_trader imports src.*)
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import src.inference.live_trader as live_trader
+from src.inference.live_trader import LiveTrader
+
+class StopLoop(BaseException):
+    # BaseException so the trade loop's `except Exception` does not swallow it
+    pass
+
+class FlakyDriver:
+    """Serves the same candles every poll; the first execute_trade fails (raise or reject)."""
+    df = None
+    fail = "raise"
+
+    def __init__(self, *args, **kwargs):
+        self.calls = 0
+        self.executed = []
+        self.lstm_states_seen = []
+        self.trader = None
+
+    async def fetch_history(self, symbol, timeframe, count=500):
+        return FlakyDriver.df
+
+    async def execute_trade(self, decision):
+        self.calls += 1
+        self.lstm_states_seen.append(self.trader.lstm_states if self.trader.level == 2 else None)
+        if self.calls == 1:
+            if FlakyDriver.fail == "raise":
+                raise ConnectionError("connection lost")
+            return False # Rejected, like MT5Driver's real-mode stub
+        self.executed.append(decision)
+        return True
+
+class BuyModel:
+    """Always BUY; the fake LSTM state counts how many bars were committed."""
+    def __init__(self):
+        self.predicts = 0
+
+    def predict(self, obs, state=None, episode_start=None):
+        self.predicts += 1
+        return np.array(1), (1 if state is None else state + 1)
+
+    @classmethod
+    def load(cls, path, device="cpu"):
+        return cls()
+
+def make_candles(n=200):
+    close = 2000 + np.cumsum(np.random.default_rng(0).normal(0, 1, n))
+    return pd.DataFrame({
+        "time": pd.date_range("2024-01-01", periods=n, freq="h"),
+        "open": close,
+        "high": close + 1,
+        "low": close - 1,
+        "close": close,
+        "tick_volume": np.full(n, 100),
+    })
+
+@pytest.fixture
+def run_trader(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path) # get_logger writes data/logs under CWD
+    monkeypatch.setattr(live_trader, "MT5Driver", FlakyDriver)
+    monkeypatch.setattr(live_trader, "PPO", BuyModel)
+    monkeypatch.setattr(live_trader, "RecurrentPPO", BuyModel)
+    FlakyDriver.df = make_candles()
+
+    sleeps = []
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) >= 3:
+            raise StopLoop()
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+
+    def _run(level, fail):
+        FlakyDriver.fail = fail
+        trader = LiveTrader("model.zip", level=level)
+        trader.driver.trader = trader
+        with pytest.raises(StopLoop):
+            asyncio.run(trader.trade_loop())
+        return trader
+    return _run
+
+@pytest.mark.parametrize("fail", ["raise", "reject"])
+def test_failed_execute_is_retried_next_poll(run_trader, fail):
+    trader = run_trader(level=1, fail=fail)
+
+    # Poll 1: execute fails. Poll 2: same bar is retried and executed.
+    # Poll 3: bar already decided -> no third order.
+    assert trader.driver.calls == 2
+    assert len(trader.driver.executed) == 1
+    assert trader.driver.executed[0]['action'] == "BUY"
+    assert trader._decided_bar_time == FlakyDriver.df['time'].iloc[-2]
+
+def test_lstm_state_committed_once_after_retry(run_trader):
+    trader = run_trader(level=2, fail="raise")
+
+    # Predicted twice (failed attempt + retry) but the bar is committed once
+    assert trader.model.predicts == 2
+    assert trader.driver.lstm_states_seen == [None, None] # Unchanged by the failed attempt
+    assert trader.lstm_states == 1
+    assert not trader.episode_starts.any()
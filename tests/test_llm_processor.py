@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("langchain_community")
+
+# Add src to path
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+
+from brain.llm_processor import LLMProcessor
+
+fmt = LLMProcessor._format_market_data
+
+def test_format_non_dict_passthrough():
+    assert fmt("raw text") == "raw text"
+    assert fmt([1, 2]) == "[1, 2]"
+
+def test_format_sorted_keys():
+    assert fmt({"symbol": "XAUUSDm", "ask": 3, "bid": 2}) == "ask=3 bid=2 symbol=XAUUSDm"
+
+def test_format_floats_keep_significant_digits():
+    out = fmt({"bid": 1.123456789, "close": 2034.56, "log_ret": 0.0000421, "rsi": 55.0})
+    assert out == "bid=1.12346 close=2034.56 log_ret=4.21e-05 rsi=55"
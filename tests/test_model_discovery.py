@@ -0,0 +1,38 @@
+
+import json
+import zipfile
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+
+from brain.model_discovery import _peek_num_timesteps, find_best_model, list_available_models
+
+def write_fake_model(path, num_timesteps):
+    # Minimal SB3-style archive: only the 'data' JSON entry matters here
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("data", json.dumps({"num_timesteps": num_timesteps, "n_steps": 2048}))
+        zf.writestr("policy.pth", b"\x00" * 16)
+
+def test_peek_num_timesteps(tmp_path):
+    model = tmp_path / "model.zip"
+    write_fake_model(model, 150000)
+    assert _peek_num_timesteps(model) == 150000
+
+def test_peek_invalid_zip(tmp_path):
+    bad = tmp_path / "bad.zip"
+    bad.write_bytes(b"not a zip")
+    assert _peek_num_timesteps(bad) is None
+
+def test_find_best_model(tmp_path):
+    write_fake_model(tmp_path / "neurotrader_L1_50000_steps.zip", 50000)
+    write_fake_model(tmp_path / "neurotrader_L1_200000_steps.zip", 200000)
+    write_fake_model(tmp_path / "neurotrader_L1_100000_steps.zip", 100000)
+    (tmp_path / "broken.zip").write_bytes(b"garbage")
+    
+    assert len(list_available_models(tmp_path)) == 4
+    assert find_best_model(tmp_path).name == "neurotrader_L1_200000_steps.zip"
+
+def test_find_best_model_missing_dir(tmp_path):
+    assert find_best_model(tmp_path / "missing") is None
@@ -1,8 +1,9 @@
 
 import pandas as pd
-import ta
-import numpy as np
+import sys
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import os
 
 import argparse
 
@@ -11,6 +12,24 @@ ROOT_DIR = Path(__file__).resolve().parent.parent
 DATA_RAW = ROOT_DIR / "data" / "raw"
 DATA_PROCESSED = ROOT_DIR / "data" / "processed"
 
+sys.path.append(str(ROOT_DIR))
+from src.brain.feature_eng import add_features
+
+FEATURE_CODE = ROOT_DIR / "src" / "brain" / "feature_eng.py"
+
+def output_path(file_path, level=1):
+    return DATA_PROCESSED / f"{file_path.stem}_L{level}.parquet"
+
+def is_up_to_date(file_path, level=1):
+    """True if the parquet is newer than its CSV and the code that built it."""
+    try:
+        out_mtime = output_path(file_path, level).stat().st_mtime
+    except FileNotFoundError:
+        return False
+    # This script owns the cleaning (dedupe/sort/ffill/min rows/dropna), feature_eng the indicators
+    return out_mtime >= max(file_path.stat().st_mtime, FEATURE_CODE.stat().st_mtime,
+                            Path(__file__).stat().st_mtime)
+
 def process_file(file_path, level=1):
     print(f"🔄 Processing: {file_path.name} [Level {level}]")
     
@@ -20,7 +39,9 @@ def process_file(file_path, level=1):
         
         # 2. Basic Cleaning
         df = df.drop_duplicates(subset=['time'])
-        df = df.sort_values('time')
+        # MT5 exports are already chronological; only sort when they are not
+        if not df['time'].is_monotonic_increasing:
+            df = df.sort_values('time')
         df = df.fillna(method='ffill')
         
         # 3. Feature Engineering (using 'ta' library)
@@ -29,40 +50,16 @@ def process_file(file_path, level=1):
              print(f"⚠️  Skipping {file_path.name}: Not enough data ({len(df)} rows)")
              return
 
-        # 4. Indicators (Common Base)
-        # Trend
-        df['ema_20'] = ta.trend.EMAIndicator(close=df['close'], window=20).ema_indicator()
-        df['ema_50'] = ta.trend.EMAIndicator(close=df['close'], window=50).ema_indicator()
-        
-        # Momentum
-        df['rsi'] = ta.momentum.RSIIndicator(close=df['close'], window=14).rsi()
-        macd = ta.trend.MACD(close=df['close'])
-        df['macd'] = macd.macd()
-        df['macd_signal'] = macd.macd_signal()
-        
-        # Volatility
-        bb = ta.volatility.BollingerBands(close=df['close'], window=20, window_dev=2.0)
-        df['bb_high'] = bb.bollinger_hband()
-        df['bb_low'] = bb.bollinger_lband()
-        
-        # [LEVEL 2] Advanced Features
-        if level >= 2:
-            # ATR for Stop Loss / Volatility sizing
-            df['atr'] = ta.volatility.AverageTrueRange(high=df['high'], low=df['low'], close=df['close'], window=14).average_true_range()
-            
-            # Lag Features (Short-term memory for MLP/LSTM)
-            # Log Returns of last 1, 2, 3, 5 candles
-            df['log_ret'] = np.log(df['close'] / df['close'].shift(1))
-            for lag in [1, 2, 3, 5]:
-                df[f'log_ret_lag_{lag}'] = df['log_ret'].shift(lag)
+        # 4. Indicators (shared with the live traders)
+        df = add_features(df, level=level)
 
         # 5. Clean NaN (from lookback periods)
         df.dropna(inplace=True)
         
         # 4. Storage Optimization
         # Create output filename with Level suffix
-        out_name = f"{file_path.stem}_L{level}.parquet"
-        out_path = DATA_PROCESSED / out_name
+        out_path = output_path(file_path, level)
+        out_name = out_path.name
         
         # Save as Parquet
         df.to_parquet(out_path, index=False)
@@ -75,6 +72,8 @@ def process_file(file_path, level=1):
 def main():
     parser = argparse.ArgumentParser(description="Process raw data into features.")
     parser.add_argument("--level", type=int, default=1, choices=[1, 2], help="Feature Level (1=Basic, 2=Advanced)")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel worker processes (1 = sequential)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the parquet is up to date")
     args = parser.parse_args()
     
     # Ensure processed directory exists
@@ -87,10 +86,29 @@ def main():
         print("⚠️  No CSV files found in data/raw/")
         return
         
+    # Skip files whose features were already built from the same CSV + code
+    if not args.force:
+        fresh = [f for f in files if is_up_to_date(f, args.level)]
+        if fresh:
+            print(f"⏭️  Up to date (use --force to rebuild): {', '.join(f.name for f in fresh)}")
+        files = [f for f in files if f not in fresh]
+        if not files:
+            print("✨ Nothing to do.")
+            return
+        
     print(f"🚀 Starting Data Pipeline (Level {args.level}) for {len(files)} files...")
     
-    for file in files:
-        process_file(file, level=args.level)
+    # Files are independent, so fan them out across processes
+    # (pandas/ta indicator code holds the GIL, threads would not help)
+    # Capped by default: M1 files are large and each worker holds one in RAM
+    workers = max(1, min(args.workers, os.cpu_count() or 1, len(files)))
+    
+    if workers == 1:
+        for file in files:
+            process_file(file, level=args.level)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(process_file, files, [args.level] * len(files)))
         
     print("\n✨ Data Processing Complete.")
 